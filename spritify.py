@@ -26,23 +26,30 @@ bl_info = {
     "blender": (2, 80, 0),
     "location": "Render > Spritify",
     "description": "Converts rendered frames into a sprite sheet once render is complete",
-    "warning": "Requires ImageMagick",
+    "warning": "Requires ImageMagick or Pillow",
     "wiki_url": "http://wiki.blender.org/index.php?title=Extensions:2.6/Py/Scripts/Render/Spritify",
     "tracker_url": "https://github.com/FreezingMoon/Spritify/issues",
     "category": "Render"}
 
 
-import bpy, os, subprocess, math, re
+import bpy, os, subprocess, re, functools, shutil, tempfile, struct, zlib, threading, io
 from bpy.app.handlers import persistent
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import PurePath
 
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    np = Image = None
+
 
 class SpriteSheetProperties(bpy.types.PropertyGroup):
     filepath: bpy.props.StringProperty(
         name = "Sprite Sheet Filepath",
-        description = "Save location for sprite sheet (should be PNG format)",
+        description = "Save location for sprite sheet (should be PNG format), sprites.png in the render output directory if empty",
         subtype = 'FILE_PATH',
-        default = os.path.join(bpy.context.preferences.filepaths.render_output_directory, "sprites.png"))
+        default = "")
     imagemagick_path: bpy.props.StringProperty(
         name = "Imagemagick Path",
         description = "Path where the Imagemagick binaries can be found (only on Linux and macOS)",
@@ -53,6 +60,7 @@ class SpriteSheetProperties(bpy.types.PropertyGroup):
         name = "Quality",
         description = "Quality setting for sprite sheet image",
         subtype = 'PERCENTAGE',
+        min = 0,
         max = 100,
         default = 100)
     is_rows: bpy.props.EnumProperty(
@@ -88,8 +96,19 @@ class SpriteSheetProperties(bpy.types.PropertyGroup):
         name = "AutoGIF",
         description = "Automatically create an animated GIF when rendering is complete",
         default = True)
+    use_pillow: bpy.props.BoolProperty(
+        name = "Use Pillow",
+        description = "Build the sprite sheet and animated GIF in-process with Pillow instead of ImageMagick. ImageMagick is still used if Pillow is not installed, for renders that aren't 8-bit PNG, JPEG, BMP, Targa or TIFF, and for frames Pillow fails to read",
+        default = True)
         
+# Only a successful registry lookup is remembered, so installing ImageMagick later still gets picked up
+_windows_bin_path = None
+
 def find_bin_path_windows():
+    global _windows_bin_path
+    if _windows_bin_path:
+        return _windows_bin_path
+
     import winreg
 
     REG_PATH = "SOFTWARE\ImageMagick\Current"
@@ -104,31 +123,54 @@ def find_bin_path_windows():
         return None
     
     print(value)
+    _windows_bin_path = value
     return value
 
 
-def build_imagepath_template(scene):
-    render_filepath = PurePath(scene.render.filepath)
-    file_suffix = render_filepath.suffix or scene.render.file_extension
+def find_imagemagick_exe(name, bin_path):
+    if os.name == "nt":
+        bin_path = find_bin_path_windows() or bin_path
+
+    # A known directory is used as-is: shutil.which() skips PATHEXT for paths with a directory,
+    # and searching PATH for "convert" on Windows finds the system disk conversion tool
+    if bin_path:
+        return os.path.join(bin_path, name)
+    return shutil.which(name) or name
+
+
+_FRAME_RE = re.compile(r"^(.+?)(#+)([^#]*)$")
+
+
+@functools.lru_cache(maxsize = 16)
+def build_imagepath_template(filepath, file_extension):
+    render_filepath = PurePath(filepath)
+    file_suffix = render_filepath.suffix or file_extension
+
+    stem = render_filepath.stem
+    stripped = stem.rstrip('#')
+    digits_count = len(stem) - len(stripped)
 
-    filename_match = re.match(r"^(.+?)(#+)([^#]*)$", render_filepath.stem)
-    if filename_match:
-        digits_count = len(filename_match.group(2))
-        index_template = "{index:0%dd}{suffix}" % digits_count
-        filename_template = filename_match.group(1) + index_template + filename_match.group(3)
+    # Common "prefix####" case doesn't need the regex
+    if digits_count and stripped and '#' not in stripped:
+        head, tail = stripped, ""
     else:
-        filename_template = render_filepath.stem + "{index:04d}{suffix}"
-    
-    filepath_template = render_filepath.with_name(filename_template).with_suffix(file_suffix)
-    return filepath_template
+        filename_match = _FRAME_RE.match(stem)
+        if filename_match:
+            head, hashes, tail = filename_match.groups()
+            digits_count = len(hashes)
+        else:
+            head, digits_count, tail = stem, 4, ""
+
+    # Template is (text before the frame number, zero padding, text after the view suffix)
+    directory = str(render_filepath)[:-len(render_filepath.name)]
+    return directory + head, digits_count, tail + file_suffix
 
 
 def build_image_paths(scene, filepath_template, suffix):
-    image_paths = []
-    for i in range(scene.frame_start, scene.frame_end + 1, scene.frame_step):
-        filepath = str(filepath_template).format(index = i, suffix = suffix)
-        image_paths.append(filepath)
-    return image_paths    
+    head, digits_count, tail = filepath_template
+    tail = suffix + tail
+    frames = range(scene.frame_start, scene.frame_end + 1, scene.frame_step)
+    return [f"{head}{i:0{digits_count}d}{tail}" for i in frames]
 
 def build_suffixes(scene):
     suffixes = []
@@ -139,102 +181,404 @@ def build_suffixes(scene):
         suffixes.append('')
     return suffixes
 
-@persistent
-def spritify(scene):
-    if scene.spritesheet.auto_sprite == True:
-        print("Making sprite sheet")        
+def build_out_filepath(scene):
+    # Resolved on use, preferences may not be ready while the add-on registers
+    filepath = scene.spritesheet.filepath or \
+        os.path.join(bpy.context.preferences.filepaths.render_output_directory, "sprites.png")
+    return PurePath(filepath)
 
-        if scene.spritesheet.is_rows == 'ROWS':
-            tile_setting = str(scene.spritesheet.tiles) + "x"
-        else:
-            tile_setting = "x" + str(scene.spritesheet.tiles)
-            
-        suffixes = build_suffixes(scene)
-        imagepath_template = build_imagepath_template(scene)
-            
-        bin_path = scene.spritesheet.imagemagick_path
-        if os.name == "nt":
-            bin_path = find_bin_pfilenamesath_windows()
-            
-        out_filepath = PurePath(scene.spritesheet.filepath)
+def build_paths_by_suffix(scene):
+    imagepath_template = build_imagepath_template(scene.render.filepath, scene.render.file_extension)
+    return {suffix: build_image_paths(scene, imagepath_template, suffix) for suffix in build_suffixes(scene)}
+
+def find_missing_frames(paths_by_suffix):
+    images = [path for images in paths_by_suffix.values() for path in images]
+    with ThreadPoolExecutor(max_workers = 32) as executor:
+        found = list(executor.map(os.path.exists, images))
+    return [path for path, exists in zip(images, found) if not exists]
+
+
+def missing_frames_message(missing):
+    return "%d rendered frame(s) not found, first missing: %s" % (len(missing), missing[0])
+
+
+def prefetch_frames(paths_by_suffix):
+    # Ask the kernel to start reading frames into the page cache (posix_fadvise is Linux only)
+    try:
+        willneed = os.POSIX_FADV_WILLNEED
+    except AttributeError:
+        return
+
+    for images in paths_by_suffix.values():
+        for path in images:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, willneed)
+            finally:
+                os.close(fd)
+
+
+def start_prefetch(paths_by_suffix):
+    # Runs alongside decoding / ImageMagick startup rather than ahead of it
+    threading.Thread(target = prefetch_frames, args = (paths_by_suffix,), daemon = True).start()
+
+
+def command_line_limit():
+    if os.name == "nt":
+        # CreateProcess caps the whole command line at 32767 characters
+        return 32000
+    try:
+        # Leave half of ARG_MAX for the environment
+        return os.sysconf("SC_ARG_MAX") // 2
+    except (AttributeError, ValueError, OSError):
+        return 128 * 1024
+
+
+def command_line_length(args):
+    if os.name == "nt":
+        # CreateProcess gets the quoted string, paths with spaces grow by two quotes each
+        return len(subprocess.list2cmdline(args))
+    return sum(len(arg) + 1 for arg in args)
+
+
+def launch_imagemagick(call, images, out_filepath):
+    # Frames go on the command line unless that would hit the length limit. Many distro
+    # policy.xml files block @file lists, so those are only used when there's no choice
+    args = call + images + [out_filepath]
+    listfile = None
+    if command_line_length(args) > command_line_limit():
+        with tempfile.NamedTemporaryFile('w', suffix = '.txt', encoding = 'utf-8', delete = False) as file:
+            file.write("\n".join('"%s"' % path for path in images))
+        listfile = file.name
+        args = call + ["@" + listfile, out_filepath]
+
+    try:
+        proc = subprocess.Popen(args, stdout = subprocess.DEVNULL, stderr = subprocess.PIPE)
+    except OSError:
+        if listfile:
+            os.unlink(listfile)
+        raise
+    return proc, listfile
+
+
+def wait_imagemagick(jobs):
+    # communicate() drains stderr so a chatty process can't block on a full pipe
+    for proc, listfile in jobs:
+        _, stderr = proc.communicate()
+        if listfile:
+            os.unlink(listfile)
+        if proc.returncode != 0:
+            print("%s failed (%d): %s" % (proc.args[0], proc.returncode, stderr.decode(errors = "replace").strip()))
+            if listfile:
+                print("Frames were passed as an @file list because of their number, "
+                      "check that ImageMagick's policy.xml allows the \"@*\" path pattern")
+
+
+def pillow_available():
+    return Image is not None
+
+
+# Render formats Pillow decodes to 8 bits per channel, anything else (EXR, HDR, DPX, Cineon, 16-bit) goes to ImageMagick
+PILLOW_FILE_FORMATS = {'PNG', 'JPEG', 'BMP', 'TARGA', 'TARGA_RAW', 'TIFF'}
+
+def use_pillow_for(scene):
+    image_settings = scene.render.image_settings
+    return scene.spritesheet.use_pillow and pillow_available() and \
+        image_settings.file_format in PILLOW_FILE_FORMATS and image_settings.color_depth == '8'
+
+
+def read_frame(path):
+    # Unbuffered readall() sizes the buffer from fstat and reads the file in one go,
+    # instead of Pillow pulling it in through many small buffered reads
+    with open(path, "rb", buffering = 0) as file:
+        return file.readall()
+
+
+def decode_frame(path):
+    try:
+        image = Image.open(io.BytesIO(read_frame(path)))
+    except OSError as error:
+        # Pillow only sees the in-memory buffer, name the frame in the error instead
+        raise OSError("%s can't be read by Pillow" % path) from error
+
+    with image:
+        # convert("RGBA") clips 16-bit and float modes instead of scaling them
+        if image.mode.startswith("I") or image.mode == "F":
+            raise OSError("%s has %s pixels, not 8-bit" % (path, image.mode))
+        return np.asarray(image.convert("RGBA"))
+
+
+# The mtime key makes a re-rendered frame miss the cache
+@functools.lru_cache(maxsize = 2048)
+def decode_frame_cached(path, mtime_ns):
+    return decode_frame(path)
+
+
+def open_frame(path, share_frames):
+    if share_frames:
+        return decode_frame_cached(path, os.stat(path).st_mtime_ns)
+    return decode_frame(path)
+
+
+def load_frame(path, width, height, bg_rgba, share_frames):
+    frame = open_frame(path, share_frames)
+    if frame.shape[:2] == (height, width) and not bg_rgba[3]:
+        return frame
+    frame = Image.fromarray(frame)
+
+    # Fit and center frames that don't match the tile size, like montage does
+    if frame.size != (width, height):
+        frame.thumbnail((width, height))
+        tile = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        tile.paste(frame, ((width - frame.width) // 2, (height - frame.height) // 2))
+        frame = tile
+
+    if bg_rgba[3]:
+        frame = Image.alpha_composite(Image.new("RGBA", frame.size, bg_rgba), frame)
+    return np.asarray(frame)
+
+
+def write_png_chunk(file, chunk_type, data):
+    file.write(struct.pack(">I", len(data)))
+    file.write(chunk_type)
+    file.write(data)
+    file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def write_png_strips(filepath, width, height, strips, compress_level):
+    """Stream an 8-bit RGBA PNG from an iterable of (rows, width, 4) uint8 arrays"""
+    compressor = zlib.compressobj(compress_level)
+    try:
+        with open(filepath, "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n")
+            write_png_chunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+            for strip in strips:
+                # Each scanline gets a Sub filter: a leading type byte, then bytes minus the pixel to their left
+                pixels = strip.reshape(strip.shape[0], width * 4)
+                scanlines = np.empty((strip.shape[0], width * 4 + 1), dtype = np.uint8)
+                scanlines[:, 0] = 1
+                scanlines[:, 1:5] = pixels[:, :4]
+                np.subtract(pixels[:, 4:], pixels[:, :-4], out = scanlines[:, 5:])
+
+                data = compressor.compress(scanlines.data)
+                if data:
+                    write_png_chunk(file, b"IDAT", data)
+
+            write_png_chunk(file, b"IDAT", compressor.flush())
+            write_png_chunk(file, b"IEND", b"")
+    except BaseException:
+        # Don't leave a truncated sheet behind when a frame fails to decode
+        try:
+            os.unlink(filepath)
+        except OSError:
+            pass
+        raise
+
+
+def build_spritesheet_pillow(scene, images, width, height, spritesheet_filepath, share_frames):
+    images_count = len(images)
+    tiles = max(1, min(scene.spritesheet.tiles, images_count))
+    if scene.spritesheet.is_rows == 'ROWS':
+        cols = tiles
+    else:
+        cols = (images_count + tiles - 1) // tiles
+    rows = (images_count + cols - 1) // cols
+
+    # Montage geometry spacing is applied on both sides of each tile
+    offset_x = scene.spritesheet.offset_x
+    offset_y = scene.spritesheet.offset_y
+    cell_width = width + 2 * offset_x
+    cell_height = height + 2 * offset_y
+
+    bg_rgba = tuple(round(c * 255) for c in scene.spritesheet.bg_color)
+
+    # Only one row of tiles is held in memory, it is encoded before the next one is decoded
+    strip = np.full((cell_height, cols * cell_width, 4), bg_rgba, dtype = np.uint8)
+    # (cols, height, width, 4) view of the frame area inside each tile of the strip
+    tiles_view = strip.reshape(cell_height, cols, cell_width, 4).swapaxes(0, 1)
+    frames_view = tiles_view[:, offset_y:offset_y + height, offset_x:offset_x + width]
+    # Contiguous staging buffer, each worker fills its own frame without locking
+    frames_stack = np.empty((cols, height, width, 4), dtype = np.uint8)
+
+    def decode_into(indexed_path):
+        c, path = indexed_path
+        frames_stack[c] = load_frame(path, width, height, bg_rgba, share_frames)
+
+    def build_strips():
+        with ThreadPoolExecutor(max_workers = os.cpu_count()) as executor:
+            for start in range(0, images_count, cols):
+                count = len(list(executor.map(decode_into, enumerate(images[start:start + cols]))))
+                np.copyto(frames_view[:count], frames_stack[:count])
+                # Last row may be short, blank the tiles left over from the previous one
+                frames_view[count:] = bg_rgba
+                yield strip
+
+    # Same mapping as ImageMagick's PNG -quality: the tens digit is the zlib level
+    compress_level = max(0, min(scene.spritesheet.quality // 10, 9))
+    write_png_strips(bpy.path.abspath(str(spritesheet_filepath)),
+                     cols * cell_width, rows * cell_height, build_strips(), compress_level)
+
+
+GIF_TRANSPARENT_INDEX = 255
+
+
+def build_gif_pillow(scene, images, gif_filepath, share_frames):
+    def open_gif_frame(path):
+        return Image.fromarray(open_frame(path, share_frames))
+
+    with ThreadPoolExecutor(max_workers = os.cpu_count()) as executor:
+        frames = list(executor.map(open_gif_frame, images))
+
+        # Derive one palette from the first, middle and last frames and map every frame onto it,
+        # keeping the last index free for transparent pixels
+        samples = [frames[i] for i in sorted({0, len(frames) // 2, len(frames) - 1})]
+        sample_sheet = Image.new("RGB", (frames[0].width, frames[0].height * len(samples)))
+        for i, frame in enumerate(samples):
+            sample_sheet.paste(frame.convert("RGB"), (0, i * frames[0].height))
+        palette = sample_sheet.quantize(colors = GIF_TRANSPARENT_INDEX)
+        colors = palette.getpalette()[:GIF_TRANSPARENT_INDEX * 3]
+        colors += [0] * (GIF_TRANSPARENT_INDEX * 3 - len(colors))
+        # quantize() can still pick the reserved index, so give it a copy of entry 0
+        # and move opaque pixels that land there back onto entry 0
+        colors += colors[:3]
+        palette.putpalette(colors)
+
+        def quantize(frame):
+            indices = np.array(frame.convert("RGB").quantize(palette = palette))
+            indices[indices == GIF_TRANSPARENT_INDEX] = 0
+            indices[np.asarray(frame.getchannel("A")) < 128] = GIF_TRANSPARENT_INDEX
+            indexed = Image.fromarray(indices, "P")
+            indexed.putpalette(colors)
+            return indexed
+
+        frames = list(executor.map(quantize, frames))
+
+    frames[0].save(bpy.path.abspath(str(gif_filepath)), save_all = True, append_images = frames[1:],
+                   duration = round(1000 / scene.render.fps), loop = 0, disposal = 2, optimize = True,
+                   transparency = GIF_TRANSPARENT_INDEX)
+
+
+def spritify(scene, paths_by_suffix, out_filepath, share_frames = False):
+    print("Making sprite sheet")        
+
+    if scene.spritesheet.is_rows == 'ROWS':
+        tile_setting = str(scene.spritesheet.tiles) + "x"
+    else:
+        tile_setting = "x" + str(scene.spritesheet.tiles)
         
-        for suffix in suffixes:
-            # Preload images
-            images = build_image_paths(scene, imagepath_template, suffix)
-            
-            # Calc number of images per file
-            images_count = len(images)
-            offset = 0
-            index = 0
-            
-            # Build spritesheet filepath
-            spritesheet_filepath = out_filepath.with_name(out_filepath.stem + suffix + out_filepath.suffix)
-
-            # While is faster than for+range
-            while offset < images_count:
-                current_images = images[offset:offset+images_count]                
-                    
-                width = scene.render.resolution_x * scene.render.resolution_percentage / 100
-                height = scene.render.resolution_y * scene.render.resolution_percentage / 100
-                
-                if scene.render.use_crop_to_border:
-                    width = scene.render.border_max_x * width - scene.render.border_min_x * width
-                    height = scene.render.border_max_y * height - scene.render.border_min_y * height
-                    
-                montage_call = [
-                    "%s/montage" % bin_path,
-                    "-depth", "8",
-                    "-tile", tile_setting,
-                    "-geometry", str(width) + "x" + str(height) \
-                        + "+" + str(scene.spritesheet.offset_x) + "+" + str(scene.spritesheet.offset_y),
-                    "-background", "rgba(" + \
-                        str(scene.spritesheet.bg_color[0] * 100) + "%, " + \
-                        str(scene.spritesheet.bg_color[1] * 100) + "%, " + \
-                        str(scene.spritesheet.bg_color[2] * 100) + "%, " + \
-                        str(scene.spritesheet.bg_color[3]) + ")",
-                    "-quality", str(scene.spritesheet.quality)
-                ]
-                montage_call.extend(current_images)
-                montage_call.append(bpy.path.abspath(str(spritesheet_filepath)))
-
-                subprocess.call(montage_call)
-                offset += images_count
-                index += 1
+    montage_path = find_imagemagick_exe("montage", scene.spritesheet.imagemagick_path)
+
+    width = scene.render.resolution_x * scene.render.resolution_percentage / 100
+    height = scene.render.resolution_y * scene.render.resolution_percentage / 100
+
+    if scene.render.use_crop_to_border:
+        width = scene.render.border_max_x * width - scene.render.border_min_x * width
+        height = scene.render.border_max_y * height - scene.render.border_min_y * height
+
+    width = round(width)
+    height = round(height)
+
+    use_pillow = use_pillow_for(scene)
+
+    # Whole percents avoid float noise like "42.99999999%" in the color string
+    r, g, b = (round(c * 100) for c in scene.spritesheet.bg_color[:3])
+    alpha = scene.spritesheet.bg_color[3]
+    geometry = f"{width}x{height}+{scene.spritesheet.offset_x}+{scene.spritesheet.offset_y}"
+
+    # Options are the same for every view, only the frames and output change
+    montage_call = [
+        montage_path,
+        "-depth", "8",
+        "-tile", tile_setting,
+        "-geometry", geometry,
+        "-background", f"rgba({r}%,{g}%,{b}%,{alpha:.4f})",
+        "-quality", str(scene.spritesheet.quality)
+    ]
+
+    jobs = []
+    for suffix, images in paths_by_suffix.items():
+        # Build spritesheet filepath
+        spritesheet_filepath = out_filepath.with_name(out_filepath.stem + suffix + out_filepath.suffix)
+
+        if use_pillow:
+            try:
+                build_spritesheet_pillow(scene, images, width, height, spritesheet_filepath, share_frames)
+                continue
+            except OSError as error:
+                # Covers UnidentifiedImageError too, montage reads far more formats than Pillow
+                print("Pillow could not build the sprite sheet (%s), using montage" % error)
+
+        jobs.append(launch_imagemagick(montage_call, images, bpy.path.abspath(str(spritesheet_filepath))))
+    return jobs
+
+
+def gifify(scene, paths_by_suffix, out_filepath, share_frames = False):
+    print("Generating animated GIF")       
+
+    convert_path = find_imagemagick_exe("convert", scene.spritesheet.imagemagick_path)
+
+    use_pillow = use_pillow_for(scene)
+
+    convert_call = [
+        convert_path,
+        "-delay", "1x" + str(scene.render.fps),
+        "-dispose", "background",
+        "-loop", "0"
+    ]
+
+    jobs = []
+    for suffix, images in paths_by_suffix.items():
+        gif_filepath = out_filepath.with_name(out_filepath.stem + suffix).with_suffix('.gif')
+
+        if use_pillow:
+            try:
+                build_gif_pillow(scene, images, gif_filepath, share_frames)
+                continue
+            except OSError as error:
+                print("Pillow could not build the animated GIF (%s), using convert" % error)
+
+        jobs.append(launch_imagemagick(convert_call, images, bpy.path.abspath(str(gif_filepath))))
+    return jobs
 
 
 @persistent
-def gifify(scene):
-    if scene.spritesheet.auto_gif == True:
-        print("Generating animated GIF")       
+def render_complete(scene):
+    if not (scene.spritesheet.auto_sprite or scene.spritesheet.auto_gif):
+        return
 
-        # If windows, try and find binary
-        convert_path = "%s/convert" % scene.spritesheet.imagemagick_path
-        
-        if os.name == "nt":
-            bin_path = find_bin_path_windows()
-            
-            if bin_path:
-                convert_path = os.path.join(bin_path, "convert")
-
-        suffixes = build_suffixes(scene)
-        filepath_template = build_imagepath_template(scene)
-        
-        out_filepath = PurePath(scene.spritesheet.filepath)
+    # Shared by both outputs so frame paths are only built once per render
+    paths_by_suffix = build_paths_by_suffix(scene)
 
-        for suffix in suffixes:
-            images = build_image_paths(scene, filepath_template, suffix)
-            gif_filepath = out_filepath.with_name(out_filepath.stem + suffix).with_suffix('.gif')
-        
-            subprocess.call([
-                convert_path,
-                "-delay", "1x" + str(scene.render.fps),
-                "-dispose", "background",
-                "-loop", "0",
-                *images,
-                bpy.path.abspath(str(gif_filepath))])
+    # Bail out before decoding or starting ImageMagick if the render left gaps
+    missing = find_missing_frames(paths_by_suffix)
+    if missing:
+        print("Spritify: " + missing_frames_message(missing))
+        return
+
+    start_prefetch(paths_by_suffix)
+    out_filepath = build_out_filepath(scene)
+
+    # Keep decoded frames around for the GIF only when both outputs will read them
+    share_frames = scene.spritesheet.auto_sprite and scene.spritesheet.auto_gif
+
+    # Let montage and convert run side by side before waiting on either
+    jobs = []
+    try:
+        if scene.spritesheet.auto_sprite:
+            jobs.extend(spritify(scene, paths_by_suffix, out_filepath, share_frames))
+        if scene.spritesheet.auto_gif:
+            jobs.extend(gifify(scene, paths_by_suffix, out_filepath, share_frames))
+    finally:
+        decode_frame_cached.cache_clear()
+        # Reap anything already started even if a later step raised, e.g. convert missing
+        wait_imagemagick(jobs)
 
 
-# Operator (just wrapping the handler to make things easy if auto_sprite is False)
+# Operator (runs the sprite sheet step of the handler on demand)
 class SpritifyOperator(bpy.types.Operator):
     """Generate a sprite sheet from completed animation render"""
     bl_idname = "render.spritify"
@@ -248,17 +592,19 @@ class SpritifyOperator(bpy.types.Operator):
 #        return False
 
     def execute(self, context):
-        toggle = False
-        if context.scene.spritesheet.auto_sprite == False:
-            context.scene.spritesheet.auto_sprite = True
-            toggle = True
-        spritify(context.scene)
-        if toggle == True:
-            context.scene.spritesheet.auto_sprite = False
+        paths_by_suffix = build_paths_by_suffix(context.scene)
+        missing = find_missing_frames(paths_by_suffix)
+        if missing:
+            self.report({'ERROR'}, missing_frames_message(missing))
+            return {'CANCELLED'}
+
+        start_prefetch(paths_by_suffix)
+        out_filepath = build_out_filepath(context.scene)
+        wait_imagemagick(spritify(context.scene, paths_by_suffix, out_filepath))
         return {'FINISHED'}
 
 
-# Operator (just wraps the handler if auto_gif is False)
+# Operator (runs the GIF step of the handler on demand)
 class GIFifyOperator(bpy.types.Operator):
     """Generate an animated GIF from completed animation render"""
     bl_idname = "render.gifify"
@@ -272,13 +618,15 @@ class GIFifyOperator(bpy.types.Operator):
 #            return False
 
     def execute(self, context):
-        toggle = False
-        if context.scene.spritesheet.auto_gif == False:
-            context.scene.spritesheet.auto_gif = True
-            toggle = True
-        gifify(context.scene)
-        if toggle == True:
-            context.scene.spritesheet.auto_gif = False
+        paths_by_suffix = build_paths_by_suffix(context.scene)
+        missing = find_missing_frames(paths_by_suffix)
+        if missing:
+            self.report({'ERROR'}, missing_frames_message(missing))
+            return {'CANCELLED'}
+
+        start_prefetch(paths_by_suffix)
+        out_filepath = build_out_filepath(context.scene)
+        wait_imagemagick(gifify(context.scene, paths_by_suffix, out_filepath))
         return {'FINISHED'}
 
 
@@ -296,6 +644,9 @@ class SpritifyPanel(bpy.types.Panel):
         layout = self.layout
     
         layout.prop(context.scene.spritesheet, "imagemagick_path")
+        row = layout.row()
+        row.enabled = pillow_available()
+        row.prop(context.scene.spritesheet, "use_pillow")
         layout.prop(context.scene.spritesheet, "filepath")
         box = layout.box()
         split = box.split(factor = 0.5)
@@ -328,8 +679,7 @@ class SpritifyPanel(bpy.types.Panel):
 def register():
     bpy.utils.register_class(SpriteSheetProperties)
     bpy.types.Scene.spritesheet = bpy.props.PointerProperty(type = SpriteSheetProperties)
-    bpy.app.handlers.render_complete.append(spritify)
-    bpy.app.handlers.render_complete.append(gifify)
+    bpy.app.handlers.render_complete.append(render_complete)
     bpy.utils.register_class(SpritifyOperator)
     bpy.utils.register_class(GIFifyOperator)
     bpy.utils.register_class(SpritifyPanel)
@@ -338,8 +688,7 @@ def unregister():
     bpy.utils.unregister_class(SpritifyPanel)
     bpy.utils.unregister_class(SpritifyOperator)
     bpy.utils.unregister_class(GIFifyOperator)
-    bpy.app.handlers.render_complete.remove(spritify)
-    bpy.app.handlers.render_complete.remove(gifify)
+    bpy.app.handlers.render_complete.remove(render_complete)
     del bpy.types.Scene.spritesheet
     bpy.utils.unregister_class(SpriteSheetProperties)
 